@@ -1,4 +1,4 @@
-from .agent import Agent
+from .agent import Agent, ActMetadata
 from .random_agent import RandomAgent
 from .nethack_ppo_agent import NethackPPOAgent
 from .nethack_muzero_agent import NethackMuZeroAgent
@@ -1,5 +1,23 @@
 import abc
 
+from typing import Any, Optional
+
+import flax.struct
+
+
+@flax.struct.dataclass
+class ActMetadata(object):
+    """
+    Per-step metadata produced by Agent.act_on_batch. A frozen dataclass with a fixed set
+    of fields keeps the pytree structure seen by jitted consumers stable, so they never
+    retrace just because a metadata dict gained or lost a key. Fields that an agent does
+    not produce are left as None and disappear from the flattened pytree.
+    """
+    memory_state_after: Optional[Any] = None
+    log_action_probs: Optional[Any] = None
+    state_values: Optional[Any] = None
+    rnd_loss: Optional[Any] = None
+
 
 class Agent(abc.ABC):
     def __init__(self, observation_space, action_space):
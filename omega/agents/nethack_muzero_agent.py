@@ -25,6 +25,7 @@ from ..utils.flax import merge_params
 from ..utils.profiling import timeit
 from ..models.nethack_muzero import NethackPerceiverMuZeroModel
 from ..mcts.muzero import mcts
+from .agent import ActMetadata
 from .trainable_agent import JaxTrainableAgentBase
 
 
@@ -251,6 +252,23 @@ class NethackMuZeroAgent(JaxTrainableAgentBase):
 
     #@timeit
     def act_on_batch(self, observation_batch, memory_batch):
+        num_devices = jax.local_device_count()
+        batch_size = pytree.get_axis_dim(observation_batch, axis=0)
+        if num_devices > 1 and batch_size % num_devices == 0:
+            # Envs are independent, so acting is embarrassingly data-parallel:
+            # shard the batch over the local devices and gather the results back
+            num_envs_per_device = batch_size // num_devices
+            observation_batch = pytree.reshape_leading_dim(
+                observation_batch, (num_devices, num_envs_per_device))
+            memory_batch = pytree.reshape_leading_dim(memory_batch, (num_devices, num_envs_per_device))
+            act_keys = jax.random.split(self.next_random_key(), num_devices)
+            actions, act_metadata = self._act_on_batch_pmap(
+                observation_batch, memory_batch, self._train_state, act_keys)
+            return (
+                pytree.flatten_leading_dims(actions, num_dims=2),
+                pytree.flatten_leading_dims(act_metadata, num_dims=2),
+            )
+
         return self._act_on_batch_jit(
             observation_batch, memory_batch, self._train_state, self.next_random_key())
 
@@ -265,6 +283,9 @@ class NethackMuZeroAgent(JaxTrainableAgentBase):
         }
 
     def update_memory_batch(self, prev_memory, new_memory_state, actions, done):
+        # The trainer passes done as a numpy array; normalize it so that the memory batch
+        # stays a pure jax pytree (pytree ops like reshape_leading_dim refuse mixed pytrees)
+        done = jnp.asarray(done)
         initial_memory_state = self._train_state.initial_memory_state_fn(self._train_state.params)
         initial_memory_state = pytree.expand_dims(initial_memory_state, axis=0)  # Add batch dim
         batch_size = new_memory_state.shape[0]
@@ -428,6 +449,14 @@ class NethackMuZeroAgent(JaxTrainableAgentBase):
     #@timeit
     @partial(jax.jit, static_argnums=(0,))
     def _act_on_batch_jit(self, observation_batch, memory_batch, train_state, rng):
+        return self._act_on_batch_impl(observation_batch, memory_batch, train_state, rng)
+
+    # in_axes must cover every positional argument, including the static self slot
+    @partial(jax.pmap, static_broadcasted_argnums=(0,), in_axes=(None, 0, 0, None, 0))
+    def _act_on_batch_pmap(self, observation_batch, memory_batch, train_state, rng):
+        return self._act_on_batch_impl(observation_batch, memory_batch, train_state, rng)
+
+    def _act_on_batch_impl(self, observation_batch, memory_batch, train_state, rng):
         mcts_stats_key, action_key = jax.random.split(rng)
 
         # Add fake timestamp dim to make a rudimentary trajectory
@@ -446,11 +475,11 @@ class NethackMuZeroAgent(JaxTrainableAgentBase):
         # Choose actions to execute in the environment
         selected_actions = jax.random.categorical(action_key, mcts_policy_log_probs)
 
-        act_metadata = {
-            'memory_state_after': updated_memory,
-            'log_mcts_action_probs': mcts_policy_log_probs,
-            'mcts_state_values': mcts_value,
-        }
+        act_metadata = ActMetadata(
+            memory_state_after=updated_memory,
+            log_action_probs=mcts_policy_log_probs,
+            state_values=mcts_value,
+        )
 
         return selected_actions, act_metadata
 
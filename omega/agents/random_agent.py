@@ -1,5 +1,5 @@
 import numpy as np
-from .agent import Agent
+from .agent import Agent, ActMetadata
 
 from ..utils import pytree
 
@@ -11,7 +11,7 @@ class RandomAgent(Agent):
     def act_on_batch(self, observation_batch, memory):
         batch_size = pytree.get_axis_dim(observation_batch, axis=0)
         random_actions = np.random.randint(low=0, high=self.action_space.n, size=(batch_size,))
-        return random_actions, {}
+        return random_actions, ActMetadata()
 
     def train_on_batch(self, trajectory_batch):
         pass
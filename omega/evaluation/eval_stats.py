@@ -59,15 +59,34 @@ class EvaluationStats(object):
         self._unique_rewards.add(reward)
 
         if done:
-            final_stats = self._finalize_episode_stats(stats)
-            self._total_steps += final_stats.num_steps
-            self._num_finished_episodes += 1
-
-            del self._running_episode_stats[episode_index]
-            self._finished_episode_stats.append(final_stats)
-            # Do not remember too many stats
-            if len(self._finished_episode_stats) > self.AVERAGE_REWARD_OVER_NUM_EPISODES:
-                self._finished_episode_stats = self._finished_episode_stats[-self.AVERAGE_REWARD_OVER_NUM_EPISODES:]
+            self._finish_episode(episode_index, stats)
+
+    def add_transition_batch(self, episode_indices, actions, rewards, done):
+        """
+        Bulk version of add_transition that takes per-environment arrays of equal length.
+        Converts the arrays to Python scalars in one go instead of boxing elements one by one.
+        """
+        self._unique_rewards.update(np.unique(rewards).tolist())
+
+        for episode_index, action, reward, done_flag in zip(
+                episode_indices.tolist(), actions.tolist(), rewards.tolist(), done.tolist()):
+            stats = self._running_episode_stats[episode_index]
+            stats.actions.append(action)
+            stats.rewards.append(reward)
+
+            if done_flag:
+                self._finish_episode(episode_index, stats)
+
+    def _finish_episode(self, episode_index, stats):
+        final_stats = self._finalize_episode_stats(stats)
+        self._total_steps += final_stats.num_steps
+        self._num_finished_episodes += 1
+
+        del self._running_episode_stats[episode_index]
+        self._finished_episode_stats.append(final_stats)
+        # Do not remember too many stats
+        if len(self._finished_episode_stats) > self.AVERAGE_REWARD_OVER_NUM_EPISODES:
+            self._finished_episode_stats = self._finished_episode_stats[-self.AVERAGE_REWARD_OVER_NUM_EPISODES:]
 
     def _finalize_episode_stats(self, stats):
         final_stats = FinishedEpisodeStats()
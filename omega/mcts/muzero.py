@@ -370,22 +370,25 @@ def mcts(
         initial_state, prediction_fn, make_tree_key,
         dirichlet_noise_alpha, root_exploration_fraction)
 
+    # Split the keys for all simulations at once: a per-iteration split would create
+    # a serial chain of RNG ops that the loop iterations have to wait on
+    expansion_keys = jax.random.split(simulation_loop_key, num_simulations)
+
     def simulation_iteration(simulation_index, loop_state):
-        rng, tree, max_depth = loop_state
-        rng, expansion_key = jax.random.split(rng)
+        tree, max_depth = loop_state
 
         leaf_index, leaf_depth = simulate(tree, puct_c1, search_policy)
         expanded_tree = expand(
             tree, leaf_index,
             prediction_fn, afterstate_prediction_fn, dynamics_fn, afterstate_dynamics_fn,
-            expansion_key)
+            expansion_keys[simulation_index])
         backproped_tree = backprop(expanded_tree, leaf_index, discount_factor)
 
-        return rng, backproped_tree, jnp.maximum(max_depth, leaf_depth)
+        return backproped_tree, jnp.maximum(max_depth, leaf_depth)
 
-    _, updated_tree, max_depth = jax.lax.fori_loop(
+    updated_tree, max_depth = jax.lax.fori_loop(
         lower=0, upper=num_simulations, body_fun=simulation_iteration,
-        init_val=(simulation_loop_key, tree, 0)
+        init_val=(tree, 0)
     )
 
     if result_policy == 'visit_count':
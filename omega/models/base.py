@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Optional
 
 import flax.linen as nn
 import jax.numpy as jnp
@@ -7,22 +7,39 @@ import jax.random
 from omega.neural import CrossTransformerNet
 
 
+def fake_quantize_embeddings(embeddings):
+    """
+    Simulates per-row symmetric int8 quantization of an embedding table with an fp16 scale.
+    Uses a straight-through estimator, so the full-precision table still receives gradients;
+    inference checkpoints can then store the table in true int8 form at half the bytes per gather.
+    """
+    scale = jnp.max(jnp.abs(embeddings), axis=-1, keepdims=True) / 127.0 + 1e-8
+    quantized = jnp.clip(jnp.round(embeddings / scale), -127, 127)
+    dequantized = (quantized.astype(jnp.float16) * scale.astype(jnp.float16)).astype(embeddings.dtype)
+    return embeddings + jax.lax.stop_gradient(dequantized - embeddings)
+
+
 class ItemEmbedder(nn.Module):
     """
     Embeds a fixed number of items, replicates embeddings over batch size.
     """
     num_items: int
     embedding_dim: int
+    quantize: bool = False
+    dtype: Any = jnp.float32
 
     def setup(self):
         self._embedder = nn.Embed(
             num_embeddings=self.num_items, features=self.embedding_dim,
+            dtype=self.dtype,
             name='embedder'
         )
 
     def __call__(self, batch_size):
         items = jnp.arange(0, self.num_items, dtype=jnp.int32)
         item_embeddings = self._embedder(items)
+        if self.quantize:
+            item_embeddings = fake_quantize_embeddings(item_embeddings)
         item_embeddings = jnp.tile(item_embeddings, reps=(batch_size, 1, 1))
 
         return item_embeddings
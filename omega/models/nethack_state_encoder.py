@@ -3,12 +3,14 @@ from typing import Optional, Tuple
 import flax.linen as nn
 import jax.numpy as jnp
 
+import numpy as np
+
 import nle.nethack
 
 from omega.neural import TransformerNet, CrossTransformerNet, DenseNet
 from omega.math import log_transform
 
-from .base import ItemEmbedder
+from .base import ItemEmbedder, fake_quantize_embeddings
 
 
 class PerceiverNethackStateEncoder(nn.Module):
@@ -30,9 +32,12 @@ class PerceiverNethackStateEncoder(nn.Module):
     transformer_use_gating: bool = False
     memory_update_num_heads: int = 8
     map_attention_num_heads: int = 2
+    map_attention_kv_chunk_size: Optional[int] = None
     use_fixed_positional_embeddings: bool = False
     positional_embeddings_num_bands: int = 32
     positional_embeddings_max_freq: int = 80
+    quantize_embeddings: bool = False
+    use_bfloat16_activations: bool = False
     deterministic: Optional[bool] = None
 
     def setup(self):
@@ -41,27 +46,41 @@ class PerceiverNethackStateEncoder(nn.Module):
         else:
             self._glyphs_size = nle.nethack.DUNGEON_SHAPE
 
+        # Computation dtype for embeddings and activations; parameters and layer norm
+        # statistics stay in float32
+        self._dtype = jnp.bfloat16 if self.use_bfloat16_activations else jnp.float32
+
         if self.use_fixed_positional_embeddings:
             self._glyph_pos_embedding_processor = nn.Dense(
                 features=self.memory_dim,
+                dtype=self._dtype,
                 name='glyph_pos_embedding_processor',
             )
+            # The raw sin/cos position features depend neither on inputs nor on parameters,
+            # so compute them once with numpy here instead of rebuilding them every forward
+            # pass; only the learned projection remains in the forward graph
+            self._fixed_pos_features = jnp.asarray(self._compute_fixed_pos_features())
         else:
             self._glyph_pos_embedder = ItemEmbedder(
                 num_items=self._glyphs_size[0] * self._glyphs_size[1],
                 embedding_dim=self.glyph_embedding_dim,
+                quantize=self.quantize_embeddings,
+                dtype=self._dtype,
                 name='glyph_pos_embedder',
             )
 
         self._glyph_embedder = nn.Embed(
             num_embeddings=nle.nethack.MAX_GLYPH + 1,
             features=self.glyph_embedding_dim,
+            dtype=self._dtype,
             name='glyph_embedder',
         )
         self._memory_embedder = ItemEmbedder(
             # bl_stats will add an extra memory unit
             num_items=self.num_memory_units - (1 if self.use_bl_stats else 0),
             embedding_dim=self.memory_dim,
+            quantize=self.quantize_embeddings,
+            dtype=self._dtype,
             name='memory_embedder',
         )
         self._memory_update_blocks = [
@@ -72,6 +91,7 @@ class PerceiverNethackStateEncoder(nn.Module):
                 use_gating=self.transformer_use_gating,
                 num_heads=self.memory_update_num_heads,
                 dropout_rate=self.transformer_dropout,
+                dtype=self._dtype,
                 deterministic=self.deterministic,
                 name=f'perceiver_self_attention_block_{block_idx}',
             )
@@ -84,6 +104,7 @@ class PerceiverNethackStateEncoder(nn.Module):
             use_gating=self.transformer_use_gating,
             num_heads=self.memory_update_num_heads,
             dropout_rate=self.transformer_dropout,
+            dtype=self._dtype,
             deterministic=self.deterministic,
             name='attention_to_prev_memory',
         )
@@ -95,6 +116,10 @@ class PerceiverNethackStateEncoder(nn.Module):
                 use_gating=self.transformer_use_gating,
                 num_heads=self.map_attention_num_heads,
                 dropout_rate=self.transformer_dropout,
+                # The glyph map is much larger than the latent memory, so attending to it
+                # in chunks keeps the score matrix small
+                kv_chunk_size=self.map_attention_kv_chunk_size,
+                dtype=self._dtype,
                 deterministic=self.deterministic,
                 name=f'perceiver_map_attention_block_{block_idx}',
             )
@@ -103,25 +128,28 @@ class PerceiverNethackStateEncoder(nn.Module):
         if self.use_bl_stats:
             self._bl_stats_network = DenseNet(
                 num_blocks=self.num_bl_stats_blocks, dim=self.memory_dim, output_dim=self.memory_dim,
+                dtype=self._dtype,
                 name='bl_stats_network',
             )
 
-    def _make_fixed_pos_embeddings(self):
-        logf = jnp.linspace(
+    def _compute_fixed_pos_features(self):
+        logf = np.linspace(
             start=0.0,
-            stop=jnp.log(0.5 * self.positional_embeddings_max_freq),
+            stop=np.log(0.5 * self.positional_embeddings_max_freq),
             num=self.positional_embeddings_num_bands,
-            dtype=jnp.float32,
+            dtype=np.float32,
         )
-        f = jnp.exp(logf)
+        f = np.exp(logf)
 
-        r_coords = jnp.linspace(-1.0, 1.0, num=self._glyphs_size[0])
-        c_coords = jnp.linspace(-1.0, 1.0, num=self._glyphs_size[1])
-        x_2d, y_2d = jnp.meshgrid(r_coords, c_coords, indexing='ij')
-        coords = jnp.stack([x_2d, y_2d], axis=-1)
+        r_coords = np.linspace(-1.0, 1.0, num=self._glyphs_size[0])
+        c_coords = np.linspace(-1.0, 1.0, num=self._glyphs_size[1])
+        x_2d, y_2d = np.meshgrid(r_coords, c_coords, indexing='ij')
+        coords = np.stack([x_2d, y_2d], axis=-1)
 
-        cfp = jnp.pi * jnp.einsum('...c,f->...cf', coords, f)
-        cfp = jnp.reshape(
+        # A plain broadcast outer product: einsum would route this through a
+        # contraction-less dot product, which is slower than an elementwise multiply
+        cfp = np.pi * (coords[..., None] * f)
+        cfp = np.reshape(
             cfp,
             (
                 self._glyphs_size[0],
@@ -129,11 +157,13 @@ class PerceiverNethackStateEncoder(nn.Module):
                 2 * self.positional_embeddings_num_bands
             )
         )
-        sin_cfp = jnp.sin(cfp)
-        cos_cfp = jnp.cos(cfp)
+        sin_cfp = np.sin(cfp)
+        cos_cfp = np.cos(cfp)
+
+        return np.concatenate([sin_cfp, cos_cfp, coords], axis=-1).astype(np.float32)
 
-        pos_embeddings = jnp.concatenate([sin_cfp, cos_cfp, coords], axis=-1)
-        pos_embeddings = self._glyph_pos_embedding_processor(pos_embeddings)
+    def _make_fixed_pos_embeddings(self):
+        pos_embeddings = self._glyph_pos_embedding_processor(self._fixed_pos_features)
         pos_embeddings = jnp.reshape(pos_embeddings, (1, -1, self.memory_dim))
 
         return pos_embeddings
@@ -144,8 +174,12 @@ class PerceiverNethackStateEncoder(nn.Module):
         glyphs = current_state_batch['glyphs']
         batch_size = glyphs.shape[0]
 
-        if self.glyph_crop_size is not None:
-            # Can be used to crop unused observation area to speedup convergence
+        if self.glyph_crop_size is not None and glyphs.shape[1:3] != tuple(self.glyph_crop_size):
+            # Can be used to crop unused observation area to speedup convergence.
+            # The trainer crops observations on the host before the device transfer,
+            # in which case the glyphs arrive here already cropped and this branch
+            # is skipped; it remains for callers that pass full-size observations
+            # (e.g. agent initialization from the raw observation space)
             if self.glyph_crop_start is not None:
                 start_r, start_c = self.glyph_crop_start
             else:
@@ -169,20 +203,31 @@ class PerceiverNethackStateEncoder(nn.Module):
         if prev_memory is not None:
             memory = self._attention_to_prev_memory_block(memory, prev_memory, deterministic=deterministic)
 
-        # Observed glyph embeddings
-        glyphs = jnp.reshape(glyphs, newshape=(glyphs.shape[0], -1))
-        glyphs_embeddings = self._glyph_embedder(glyphs)
-
-        # Add positional embedding to glyphs (fixed or learned)
+        # Positional embeddings for the glyphs (fixed or learned). A single (1, HW, dim)
+        # table is enough: it broadcasts into the gather+add below, so there is no need
+        # to materialize a per-batch copy of the table
         if self.use_fixed_positional_embeddings:
             glyph_pos_embeddings = self._make_fixed_pos_embeddings()
         else:
-            glyph_pos_embeddings = self._glyph_pos_embedder(batch_size)
-        glyphs_embeddings += glyph_pos_embeddings
+            glyph_pos_embeddings = self._glyph_pos_embedder(batch_size=1)
+
+        # Observed glyph embeddings: gather directly from the embedding table and add
+        # positional embeddings in the same expression, so that XLA sees a pure gather+add
+        # and fuses it with the consumer instead of materializing an intermediate tensor
+        glyph_embedding_table = self._glyph_embedder.embedding.astype(self._dtype)
+        if self.quantize_embeddings:
+            glyph_embedding_table = fake_quantize_embeddings(glyph_embedding_table)
+        # Gather straight from the (batch, height, width) glyph tensor: reshaping the indices
+        # before the gather can block XLA from fusing it with the crop slice above, while
+        # reshaping the gathered output is free
+        glyphs_embeddings = jnp.take(glyph_embedding_table, glyphs, axis=0)
+        glyphs_embeddings = jnp.reshape(
+            glyphs_embeddings, (batch_size, -1, self.glyph_embedding_dim)) + glyph_pos_embeddings
 
         # Perceiver body
         for block_idx in range(self.num_perceiver_blocks):
             memory = self._map_attention_blocks[block_idx](memory, glyphs_embeddings, deterministic=deterministic)
             memory = self._memory_update_blocks[block_idx](memory, deterministic=deterministic)
 
-        return memory
+        # Hand the result back in float32 regardless of the internal computation dtype
+        return memory.astype(jnp.float32)
@@ -1,2 +1,3 @@
+from .attention import chunked_dot_product_attention, fused_dot_product_attention
 from .transformer import TransformerBlock, TransformerNet, CrossTransformerNet
 from .dense import DenseNet
\ No newline at end of file
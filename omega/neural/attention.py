@@ -0,0 +1,94 @@
+import jax
+import jax.numpy as jnp
+
+from flax import linen as nn
+
+# Newer jax versions ship a fused attention entry point that XLA can lower to
+# cuDNN's flash-attention kernels on supported GPUs
+_JAX_FUSED_ATTENTION_AVAILABLE = hasattr(jax.nn, 'dot_product_attention')
+
+
+def fused_dot_product_attention(
+        query, key, value, bias=None, mask=None, broadcast_dropout=True,
+        dropout_rng=None, dropout_rate=0.0, deterministic=False, dtype=jnp.float32, precision=None):
+    """
+    Dispatches to jax.nn.dot_product_attention when the installed jax version provides it,
+    opting into XLA's fused attention kernels, and falls back to the flax implementation
+    otherwise. The fused path only covers the plain no-bias/no-mask/no-dropout case; anything
+    else goes through the flax implementation.
+
+    Follows the flax.linen.dot_product_attention calling convention, so it can be passed
+    directly to MultiHeadDotProductAttention as attention_fn.
+    """
+    if (
+            _JAX_FUSED_ATTENTION_AVAILABLE and query.ndim == 4 and
+            bias is None and mask is None and
+            (dropout_rate == 0.0 or deterministic)
+    ):
+        return jax.nn.dot_product_attention(query, key, value).astype(dtype)
+
+    return nn.dot_product_attention(
+        query, key, value, bias=bias, mask=mask, broadcast_dropout=broadcast_dropout,
+        dropout_rng=dropout_rng, dropout_rate=dropout_rate, deterministic=deterministic,
+        dtype=dtype, precision=precision)
+
+
+def chunked_dot_product_attention(
+        query, key, value, kv_chunk_size, bias=None, mask=None, broadcast_dropout=True,
+        dropout_rng=None, dropout_rate=0.0, deterministic=False, dtype=jnp.float32, precision=None):
+    """
+    Computes dot-product attention over fixed-size chunks of keys/values with a running softmax,
+    so that the full (num_queries, num_keys) score matrix is never materialized at once.
+    Useful when a small set of queries attends to a large set of keys (e.g. latent memory
+    attending to the glyph map). Falls back to the standard flax implementation when attention
+    bias, mask or dropout is requested, which the chunked computation does not support.
+
+    Follows the same calling convention as flax.linen.dot_product_attention, except for the
+    extra kv_chunk_size argument (bind it with functools.partial before passing the function
+    to MultiHeadDotProductAttention).
+    """
+    if bias is not None or mask is not None or (dropout_rate > 0.0 and not deterministic):
+        return nn.dot_product_attention(
+            query, key, value, bias=bias, mask=mask, broadcast_dropout=broadcast_dropout,
+            dropout_rng=dropout_rng, dropout_rate=dropout_rate, deterministic=deterministic,
+            dtype=dtype, precision=precision)
+
+    depth = query.shape[-1]
+    query = query / jnp.sqrt(depth).astype(dtype)
+
+    kv_axis = key.ndim - 3
+    num_kv = key.shape[kv_axis]
+    num_chunks = (num_kv + kv_chunk_size - 1) // kv_chunk_size
+    num_padded_kv = num_chunks * kv_chunk_size
+
+    if num_padded_kv > num_kv:
+        pad_width = [(0, 0)] * key.ndim
+        pad_width[kv_axis] = (0, num_padded_kv - num_kv)
+        key = jnp.pad(key, pad_width)
+        value = jnp.pad(value, pad_width)
+    kv_is_valid = jnp.arange(num_padded_kv) < num_kv
+
+    def attend_to_chunk(chunk_index):
+        chunk_start = chunk_index * kv_chunk_size
+        key_chunk = jax.lax.dynamic_slice_in_dim(key, chunk_start, kv_chunk_size, axis=kv_axis)
+        value_chunk = jax.lax.dynamic_slice_in_dim(value, chunk_start, kv_chunk_size, axis=kv_axis)
+        chunk_is_valid = jax.lax.dynamic_slice_in_dim(kv_is_valid, chunk_start, kv_chunk_size, axis=0)
+
+        scores = jnp.einsum('...qhd,...khd->...qhk', query, key_chunk, precision=precision)
+        scores = jnp.where(chunk_is_valid, scores, -1e30)
+        max_score = jax.lax.stop_gradient(jnp.max(scores, axis=-1, keepdims=True))
+        exp_scores = jnp.exp(scores - max_score)
+        exp_values = jnp.einsum('...qhk,...khd->...qhd', exp_scores, value_chunk, precision=precision)
+
+        return exp_values, jnp.sum(exp_scores, axis=-1), jnp.squeeze(max_score, axis=-1)
+
+    chunk_exp_values, chunk_exp_sums, chunk_max_scores = jax.lax.map(
+        attend_to_chunk, jnp.arange(num_chunks))
+
+    # Renormalize the per-chunk results to the global softmax
+    global_max_scores = jnp.max(chunk_max_scores, axis=0)
+    chunk_scales = jnp.exp(chunk_max_scores - global_max_scores)
+    numerator = jnp.sum(chunk_exp_values * chunk_scales[..., None], axis=0)
+    denominator = jnp.sum(chunk_exp_sums * chunk_scales, axis=0)
+
+    return (numerator / denominator[..., None]).astype(dtype)
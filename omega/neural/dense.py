@@ -1,4 +1,7 @@
+from typing import Any
+
 import flax.linen as nn
+import jax.numpy as jnp
 
 
 class DenseNet(nn.Module):
@@ -6,21 +9,25 @@ class DenseNet(nn.Module):
     dim: int
     output_dim: int
     activation: str = 'relu'
+    dtype: Any = jnp.float32
 
     def setup(self):
         self._input_dense = nn.Dense(
             features=self.dim,
+            dtype=self.dtype,
             name='input_dense',
         )
         self._dense = [
             nn.Dense(
                 features=self.dim,
+                dtype=self.dtype,
                 name=f'dense_{block_idx}',
             )
             for block_idx in range(self.num_blocks)
         ]
         self._output_dense = nn.Dense(
             self.output_dim,
+            dtype=self.dtype,
             name='output_dense',
         )
         self._norm = [
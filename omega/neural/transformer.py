@@ -1,9 +1,12 @@
 from dataclasses import field
-from typing import Optional, Dict
+from functools import partial
+from typing import Any, Optional, Dict
 
 import jax.random
+import jax.numpy as jnp
 from flax import linen as nn
 
+from .attention import chunked_dot_product_attention, fused_dot_product_attention
 from .gating import GRUGate
 
 
@@ -14,16 +17,26 @@ class TransformerBlock(nn.Module):
     dropout_rate: float = 0.1
     use_gating: bool = False
     gating_config: Dict = field(default_factory=dict)
+    kv_chunk_size: Optional[int] = None
+    dtype: Any = jnp.float32
     deterministic: Optional[bool] = None
 
     def setup(self):
         assert self.dim % self.num_heads == 0
+        if self.kv_chunk_size is not None:
+            # Attend to keys/values chunk by chunk to avoid materializing the full score matrix
+            attention_fn = partial(chunked_dot_product_attention, kv_chunk_size=self.kv_chunk_size)
+        else:
+            attention_fn = fused_dot_product_attention
         self._att = nn.MultiHeadDotProductAttention(
             num_heads=self.num_heads,
             qkv_features=self.dim,
-            out_features=self.dim)
-        self._fc_inner = nn.Dense(self.fc_inner_dim)
-        self._fc = nn.Dense(self.dim)
+            out_features=self.dim,
+            dtype=self.dtype,
+            attention_fn=attention_fn)
+        # Layer norms are kept in float32: their statistics do not tolerate reduced precision well
+        self._fc_inner = nn.Dense(self.fc_inner_dim, dtype=self.dtype)
+        self._fc = nn.Dense(self.dim, dtype=self.dtype)
         self._att_norm_q = nn.LayerNorm()
         self._att_norm_k = nn.LayerNorm()
         self._att_norm_v = nn.LayerNorm()
@@ -72,6 +85,8 @@ class TransformerNetBase(nn.Module):
     dropout_rate: float = 0.1
     use_gating: bool = False
     gating_config: Dict = field(default_factory=dict)
+    kv_chunk_size: Optional[int] = None
+    dtype: Any = jnp.float32
     deterministic: Optional[bool] = None
 
     def setup(self):
@@ -83,6 +98,8 @@ class TransformerNetBase(nn.Module):
                 dropout_rate=self.dropout_rate,
                 use_gating=self.use_gating,
                 gating_config=self.gating_config,
+                kv_chunk_size=self.kv_chunk_size,
+                dtype=self.dtype,
                 deterministic=self.deterministic,
                 name = f'block_{block_idx}',
             )
@@ -0,0 +1,8 @@
+import os
+
+# Force multiple XLA host devices so that multi-device (pmap) code paths can be
+# exercised in tests. This must happen before jax initializes its backends,
+# which is why it lives in conftest rather than in the test modules themselves.
+if '--xla_force_host_platform_device_count' not in os.environ.get('XLA_FLAGS', ''):
+    os.environ['XLA_FLAGS'] = (
+        os.environ.get('XLA_FLAGS', '') + ' --xla_force_host_platform_device_count=2')
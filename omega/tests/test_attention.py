@@ -0,0 +1,47 @@
+import functools
+
+import jax
+import jax.numpy as jnp
+import numpy as np
+
+from flax import linen as nn
+
+from omega.neural import chunked_dot_product_attention
+
+
+def _make_attention_inputs(rng, num_queries, num_kv, num_heads=2, depth=4):
+    query_key, key_key, value_key = jax.random.split(rng, 3)
+    query = jax.random.normal(query_key, (2, num_queries, num_heads, depth))
+    key = jax.random.normal(key_key, (2, num_kv, num_heads, depth))
+    value = jax.random.normal(value_key, (2, num_kv, num_heads, depth))
+    return query, key, value
+
+
+def test_chunked_attention_matches_flax():
+    # 17 keys with chunk size 5 exercises the padded last chunk,
+    # 15 keys the exactly-divisible case
+    for num_kv in [17, 15]:
+        query, key, value = _make_attention_inputs(
+            jax.random.PRNGKey(31337), num_queries=3, num_kv=num_kv)
+
+        expected = nn.dot_product_attention(query, key, value)
+        actual = chunked_dot_product_attention(query, key, value, kv_chunk_size=5)
+
+        np.testing.assert_allclose(np.asarray(actual), np.asarray(expected), atol=1e-5)
+
+
+def test_chunked_attention_matches_flax_gradients():
+    query, key, value = _make_attention_inputs(jax.random.PRNGKey(31337), num_queries=3, num_kv=17)
+
+    def attention_sum(attention_fn, query, key, value):
+        return jnp.sum(attention_fn(query, key, value))
+
+    expected_grads = jax.grad(
+        functools.partial(attention_sum, nn.dot_product_attention), argnums=(0, 1, 2))(query, key, value)
+    actual_grads = jax.grad(
+        functools.partial(
+            attention_sum, functools.partial(chunked_dot_product_attention, kv_chunk_size=5)),
+        argnums=(0, 1, 2))(query, key, value)
+
+    for actual, expected in zip(actual_grads, expected_grads):
+        np.testing.assert_allclose(np.asarray(actual), np.asarray(expected), atol=1e-5)
@@ -0,0 +1,30 @@
+import numpy as np
+
+from omega.evaluation import EvaluationStats
+
+
+def test_add_transition_batch_matches_scalar_version():
+    scalar_stats = EvaluationStats(discount_factor=0.9)
+    batch_stats = EvaluationStats(discount_factor=0.9)
+
+    episode_indices = np.array([0, 1, 2])
+    transitions = [
+        (np.array([1, 2, 3]), np.array([0.0, 1.0, -0.5]), np.array([False, False, True])),
+        (np.array([4, 5, 6]), np.array([1.0, 0.0, 0.5]), np.array([True, True, False])),
+    ]
+
+    for actions, rewards, done in transitions:
+        for env_index in range(len(episode_indices)):
+            scalar_stats.add_transition(
+                episode_indices[env_index].item(),
+                actions[env_index].item(),
+                rewards[env_index].item(),
+                done[env_index].item(),
+            )
+        batch_stats.add_transition_batch(episode_indices, actions, rewards, done)
+
+    scalar_dict = scalar_stats.to_dict()
+    batch_dict = batch_stats.to_dict()
+    assert scalar_dict.keys() == batch_dict.keys()
+    for key in scalar_dict:
+        assert scalar_dict[key] == batch_dict[key]
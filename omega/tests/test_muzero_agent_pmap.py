@@ -0,0 +1,81 @@
+import gym.spaces
+import jax
+import jax.numpy as jnp
+import numpy as np
+import pytest
+
+import nle.nethack
+
+from omega.agents import NethackMuZeroAgent
+
+
+# A deliberately tiny agent: the test only cares about sharding and pytree plumbing,
+# not about the quality of the search
+TINY_AGENT_CONFIG = {
+    'reward_values': [-1.0, 0.0, 1.0],
+    'num_mcts_simulations': 2,
+    'model_config': {
+        'num_chance_outcomes': 2,
+        'state_encoder_config': {
+            'glyph_crop_start': [0, 0],
+            'glyph_crop_size': [3, 3],
+            'glyph_embedding_dim': 8,
+            'num_memory_units': 4,
+            'memory_dim': 8,
+            'num_bl_stats_blocks': 1,
+            'num_perceiver_blocks': 1,
+            'num_perceiver_self_attention_subblocks': 1,
+            'transformer_fc_inner_dim': 8,
+            'memory_update_num_heads': 2,
+            'map_attention_num_heads': 2,
+        },
+        'memory_aggregator_config': {'num_blocks': 1, 'num_heads': 2, 'fc_inner_dim': 8},
+        'dynamics_transformer_config': {'num_blocks': 1, 'num_heads': 2, 'fc_inner_dim': 8},
+        'scalar_predictor_config': {
+            'transformer_num_blocks': 1, 'transformer_num_heads': 2, 'transformer_fc_inner_dim': 8},
+        'action_outcome_predictor_config': {
+            'transformer_num_blocks': 1, 'transformer_num_heads': 2, 'transformer_fc_inner_dim': 8},
+    },
+}
+
+
+def _make_tiny_agent():
+    observation_space = gym.spaces.Dict({
+        'glyphs': gym.spaces.Box(
+            low=0, high=nle.nethack.MAX_GLYPH, shape=nle.nethack.DUNGEON_SHAPE, dtype=np.int32),
+        'blstats': gym.spaces.Box(
+            low=-2 ** 31, high=2 ** 31 - 1, shape=nle.nethack.BLSTATS_SHAPE, dtype=np.int32),
+    })
+    action_space = gym.spaces.Discrete(4)
+    return NethackMuZeroAgent(
+        observation_space=observation_space, action_space=action_space,
+        replay_buffer=None, config=TINY_AGENT_CONFIG)
+
+
+@pytest.mark.skipif(jax.local_device_count() < 2, reason='requires more than one XLA device')
+def test_act_on_batch_shards_over_devices():
+    agent = _make_tiny_agent()
+    batch_size = jax.local_device_count()
+
+    observation_batch = {
+        key: jnp.zeros((batch_size,) + space.shape, dtype=space.dtype)
+        for key, space in agent.observation_space.spaces.items()
+    }
+    memory_batch = agent.init_memory_batch(batch_size)
+
+    actions, act_metadata = agent.act_on_batch(observation_batch, memory_batch)
+    assert actions.shape == (batch_size,)
+    assert act_metadata.log_action_probs.shape == (batch_size, agent.action_space.n)
+    assert act_metadata.state_values.shape == (batch_size,)
+
+    # Thread the memory through update_memory_batch with numpy done flags, the same
+    # way the trainer does after an environment step, and make sure the next act
+    # still shards cleanly over the devices
+    memory_batch = agent.update_memory_batch(
+        prev_memory=memory_batch,
+        new_memory_state=act_metadata.memory_state_after,
+        actions=actions,
+        done=np.zeros(batch_size, dtype=np.bool_),
+    )
+    actions, _ = agent.act_on_batch(observation_batch, memory_batch)
+    assert actions.shape == (batch_size,)
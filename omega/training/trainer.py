@@ -1,8 +1,11 @@
 import abc
-from functools import partial
+import queue
+import threading
 
 import jax
 
+import numpy as np
+
 from ..utils.gym import RayEnvStepper, StayInTerminalStateWrapper, AutoResetWrapper
 from ..utils import pytree
 from ..utils.profiling import timeit
@@ -11,10 +14,15 @@ from ..utils.profiling import timeit
 class Trainer(abc.ABC):
     def __init__(
             self, agent, env_factory, num_envs, num_collection_steps, num_workers,
-            allow_to_act_in_terminal_state_once=False):
+            allow_to_act_in_terminal_state_once=False,
+            glyph_crop_start=None, glyph_crop_size=None):
         self._agent = agent
         self._num_collection_steps = num_collection_steps
         self._num_envs = num_envs
+        # When the model crops the glyph map anyway, cropping on the host before
+        # the device transfer avoids shipping observation area that will be discarded
+        self._glyph_crop_start = glyph_crop_start
+        self._glyph_crop_size = glyph_crop_size
 
         def _env_factory():
             env = env_factory()
@@ -26,11 +34,26 @@ class Trainer(abc.ABC):
             return env
 
         self._batched_env_stepper = RayEnvStepper(_env_factory, num_envs, num_workers)
-        self._current_episode_indices = list(range(num_envs))
+        self._current_episode_indices = np.arange(num_envs)
         self._next_episode_index = num_envs
 
         self._agent_memory = self._agent.init_memory_batch(num_envs)
-        self._current_state_batch_np = self._batched_env_stepper.reset()
+        self._current_state_batch_np = self._crop_observation_batch(self._batched_env_stepper.reset())
+        self._current_state_batch_jax = jax.device_put(self._current_state_batch_np)
+        # Host-side buffers for a day worth of transitions, allocated on first use
+        self._transition_buffers = None
+
+        # Observation and memory batch shapes are fixed for the lifetime of the trainer,
+        # so a single warm-up call here compiles the acting path up front; the collection
+        # loop then always hits the same cached executable instead of paying the
+        # compilation latency on the first step of the first day
+        self._agent.act_on_batch(self._current_state_batch_jax, self._agent_memory)
+
+        # Stats ingestion runs on a background thread so that episode bookkeeping
+        # stays off the collection hot path; the queue is bounded so the collection
+        # loop blocks instead of running away if ingestion ever lags behind
+        self._stats_queue = queue.Queue(maxsize=num_collection_steps)
+        threading.Thread(target=self._stats_worker, daemon=True).start()
 
     @property
     def agent(self):
@@ -47,55 +70,102 @@ class Trainer(abc.ABC):
         self._run_night(stats, trajectory_batch)
 
     def _run_day(self, stats):
-        transition_batches = []
-
         for step in range(self.num_collection_steps):
             action_batch_jax, act_metadata_batch_jax = self.agent.act_on_batch(
-                self._current_state_batch_np, self._agent_memory)
+                self._current_state_batch_jax, self._agent_memory)
+            # Start moving actions and metadata back to the host as soon as they are computed,
+            # so that the blocking conversions below find the data already in flight
+            pytree.copy_to_host_async((action_batch_jax, act_metadata_batch_jax))
             # Copy actions back to CPU because indexing GPU memory will slow everything down significantly
             action_batch_np = pytree.to_numpy(action_batch_jax)
-            reward_done_next_state_batch_np = self._batched_env_stepper.step(action_batch_np)
-            reward_done_next_state_batch_jax = pytree.to_jax(reward_done_next_state_batch_np)
-
-            for env_index in range(self._num_envs):
-                if stats is not None:
-                    stats.add_transition(
-                        self._current_episode_indices[env_index],
-                        action_batch_np[env_index].item(),
-                        reward_done_next_state_batch_np['rewards'][env_index].item(),
-                        reward_done_next_state_batch_np['done'][env_index].item(),
-                    )
-
-                if reward_done_next_state_batch_np['done'][env_index]:
-                    # Allocate a new episode index for stats accumulation
-                    self._current_episode_indices[env_index] = self._next_episode_index
-                    self._next_episode_index += 1
-
-            transition_batches.append(
-                dict(
-                    memory_before=self._agent_memory,
-                    current_state=self._current_state_batch_np,
-                    actions=action_batch_jax,
-                    act_metadata=act_metadata_batch_jax,
-                    **reward_done_next_state_batch_jax,
-                )
+            # Kick off environment stepping on the Ray workers, then do host-side bookkeeping
+            # while they are busy, and collect the results only when they are actually needed
+            self._batched_env_stepper.step_async(action_batch_np)
+
+            # Keep per-step transitions in host memory: actions and metadata are small,
+            # and accumulating numpy arrays lets us do a single device transfer at the end
+            # of the day instead of one small transfer per step
+            transition_batch = dict(
+                memory_before=pytree.to_numpy(self._agent_memory),
+                current_state=self._current_state_batch_np,
+                actions=action_batch_np,
+                act_metadata=pytree.to_numpy(act_metadata_batch_jax),
             )
 
+            reward_done_next_state_batch_np = self._batched_env_stepper.step_wait()
+            reward_done_next_state_batch_np['next_state'] = self._crop_observation_batch(
+                reward_done_next_state_batch_np['next_state'])
+
+            # Start moving the next state batch to the device right away, so that the
+            # transfer overlaps with the host-side bookkeeping below; the numpy copy
+            # is still needed for the transition buffers
+            self._current_state_batch_np = reward_done_next_state_batch_np['next_state']
+            self._current_state_batch_jax = jax.device_put(self._current_state_batch_np)
+
+            rewards_np = reward_done_next_state_batch_np['rewards']
+            done_np = reward_done_next_state_batch_np['done']
+
+            if stats is not None:
+                # Hand the arrays off to the stats thread; the episode indices are copied
+                # because they are updated below when episodes finish
+                self._stats_queue.put(
+                    (stats, self._current_episode_indices.copy(), action_batch_np, rewards_np, done_np))
+
+            # Allocate new episode indices for stats accumulation where episodes have finished
+            done_env_indices = np.flatnonzero(done_np)
+            self._current_episode_indices[done_env_indices] = np.arange(
+                self._next_episode_index, self._next_episode_index + done_env_indices.size)
+            self._next_episode_index += done_env_indices.size
+
+            self._write_transition_batch(step, pytree.update(transition_batch, reward_done_next_state_batch_np))
+
             self._agent_memory = self.agent.update_memory_batch(
                 prev_memory=self._agent_memory,
-                new_memory_state=act_metadata_batch_jax.get('memory_state_after'),
+                new_memory_state=act_metadata_batch_jax.memory_state_after,
                 actions=action_batch_jax,
-                done=reward_done_next_state_batch_jax['done'],
+                done=done_np,
             )
 
-            self._current_state_batch_np = reward_done_next_state_batch_np['next_state']
-
-        return self._stack_transition_batches(transition_batches)
+        # Make sure the stats thread has ingested everything from this day
+        # before the night stage starts reading the stats
+        self._stats_queue.join()
+
+        # Move the whole day of transitions to the device in a single transfer
+        return jax.device_put(self._transition_buffers)
+
+    def _crop_observation_batch(self, observation_batch):
+        if self._glyph_crop_size is None or 'glyphs' not in observation_batch:
+            return observation_batch
+
+        glyphs = observation_batch['glyphs']
+        if self._glyph_crop_start is not None:
+            start_r, start_c = self._glyph_crop_start
+        else:
+            start_r = (glyphs.shape[1] - self._glyph_crop_size[0]) // 2
+            start_c = (glyphs.shape[2] - self._glyph_crop_size[1]) // 2
+        glyphs = glyphs[:, start_r:start_r + self._glyph_crop_size[0], start_c:start_c + self._glyph_crop_size[1]]
+
+        return pytree.update(observation_batch, {'glyphs': glyphs})
+
+    def _stats_worker(self):
+        while True:
+            stats, episode_indices, actions, rewards, done = self._stats_queue.get()
+            stats.add_transition_batch(episode_indices, actions, rewards, done)
+            self._stats_queue.task_done()
+
+    def _write_transition_batch(self, step, transition_batch):
+        if self._transition_buffers is None:
+            # Allocate (num_envs, num_collection_steps, ...) buffers once, based on the
+            # shapes of the first collected transition, and reuse them across days;
+            # writing slices in place avoids rebuilding per-step pytrees just to stack them
+            self._transition_buffers = jax.tree_map(
+                lambda t: np.empty((t.shape[0], self._num_collection_steps) + t.shape[1:], dtype=t.dtype),
+                transition_batch,
+            )
 
-    @partial(jax.jit, static_argnums=(0,))
-    def _stack_transition_batches(self, transition_batches):
-        # Stack along timestamp dimension, return as GPU tensors
-        return pytree.stack(transition_batches, axis=1, result_backend='jax')
+        def write_step(buffer, value):
+            buffer[:, step] = value
+        jax.tree_map(write_step, self._transition_buffers, transition_batch)
 
     @abc.abstractmethod
     def _run_night(self, stats, collected_trajectories):
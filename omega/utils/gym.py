@@ -146,6 +146,7 @@ class RayEnvStepper(object):
             RayEnvWorker.remote(env_factory, num_envs=self._num_envs_per_worker[worker_index])
             for worker_index in range(num_workers)
         ]
+        self._pending_step_promises = None
 
     def reset(self):
         worker_result_promises = []
@@ -156,6 +157,15 @@ class RayEnvStepper(object):
         return pytree.concatenate(worker_results, axis=0)
 
     def step(self, action_batch):
+        self.step_async(action_batch)
+        return self.step_wait()
+
+    def step_async(self, action_batch):
+        """
+        Submits a step to the workers without waiting for the results,
+        allowing the caller to overlap stepping with other work.
+        """
+        assert self._pending_step_promises is None, 'There is another step in progress'
         prev_index = 0
         worker_result_promises = []
         for worker_index in range(len(self._workers)):
@@ -164,5 +174,10 @@ class RayEnvStepper(object):
             )
             worker_result_promises.append(worker_result_promise)
             prev_index += self._num_envs_per_worker[worker_index]
-        worker_results = ray.get(worker_result_promises)
+        self._pending_step_promises = worker_result_promises
+
+    def step_wait(self):
+        assert self._pending_step_promises is not None, 'No step is in progress'
+        worker_results = ray.get(self._pending_step_promises)
+        self._pending_step_promises = None
         return pytree.concatenate(worker_results, axis=0)
\ No newline at end of file
@@ -63,6 +63,16 @@ def get_axis_dim(pytree, axis):
     return axis_dim
 
 
+def reshape_leading_dim(pytree, new_dims, result_backend=None):
+    reshape_op = _select_op(pytree, result_backend, np.reshape, jnp.reshape)
+    return jax.tree_map(lambda t: reshape_op(t, tuple(new_dims) + t.shape[1:]), pytree)
+
+
+def flatten_leading_dims(pytree, num_dims, result_backend=None):
+    reshape_op = _select_op(pytree, result_backend, np.reshape, jnp.reshape)
+    return jax.tree_map(lambda t: reshape_op(t, (-1,) + t.shape[num_dims:]), pytree)
+
+
 # TODO: introduce a universal slicer
 def batch_dim_slice(batch, slice_idx):
     return jax.tree_map(lambda t: t[slice_idx, ...], batch)
@@ -88,6 +98,19 @@ def concatenate(pytrees, axis, result_backend=None):
     )
 
 
+def copy_to_host_async(pytree):
+    """
+    Starts an asynchronous device-to-host copy of every leaf that supports it.
+    A later to_numpy will then find the data already on the host (or at least in flight)
+    instead of kicking off the transfer at the blocking call.
+    """
+    def start_copy(leaf):
+        start_copy_op = getattr(leaf, 'copy_to_host_async', None)
+        if start_copy_op is not None:
+            start_copy_op()
+    jax.tree_map(start_copy, pytree)
+
+
 def to_numpy(pytree):
     return jax.tree_map(lambda t: np.asarray(t), pytree)
 
@@ -64,6 +64,13 @@ def create_agent(config, env):
         raise ValueError(f'Unknown agent type: {agent_type}')
 
 
+def get_glyph_crop_params(config):
+    # The trainer crops observations on the host before transferring them to the device,
+    # so it needs to know the crop configured for the state encoder
+    state_encoder_config = config['agent_config'].get('model_config', {}).get('state_encoder_config', {})
+    return state_encoder_config.get('glyph_crop_start'), state_encoder_config.get('glyph_crop_size')
+
+
 def train_agent(args):
     config = load_config(args.config)
     train_config = config['train_config']
@@ -76,6 +83,7 @@ def train_agent(args):
         train_config, episodes_dir=args.episodes, episode_video_dir=args.episode_videos)
     env = env_factory()
     agent = create_agent(config, env)
+    glyph_crop_start, glyph_crop_size = get_glyph_crop_params(config)
     trainer = OnPolicyTrainer(
         agent=agent,
         env_factory=env_factory,
@@ -83,6 +91,8 @@ def train_agent(args):
         num_envs=train_config['num_envs'],
         num_collection_steps=train_config['num_collection_steps'],
         allow_to_act_in_terminal_state_once=train_config['allow_to_act_in_terminal_state_once'],
+        glyph_crop_start=glyph_crop_start,
+        glyph_crop_size=glyph_crop_size,
     )
 
     start_day = 0
@@ -110,12 +120,15 @@ def eval_agent(args):
         config['train_config'], episodes_dir=args.episodes, episode_video_dir=args.episode_videos)
     env = env_factory()
     agent = create_agent(config, env)
+    glyph_crop_start, glyph_crop_size = get_glyph_crop_params(config)
     trainer = DummyTrainer(
         agent=agent,
         env_factory=env_factory,
         num_workers=args.num_workers,
         num_envs=args.num_parallel_envs,
         num_collection_steps=1,
+        glyph_crop_start=glyph_crop_start,
+        glyph_crop_size=glyph_crop_size,
     )
 
     start_day = agent.try_load_from_checkpoint(args.checkpoints)